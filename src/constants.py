@@ -1,2 +1,4 @@
 REPORT_NAMES = ["payout", "average_rate"]
 VALID_RATE_FIELDS = {"hourly_rate", "rate", "salary"}
+STREAM_CHUNK_SIZE = 4096
+MAX_PRESIZED_RECORDS = 1_000_000
@@ -9,6 +9,7 @@
 - Экспорт результатов в JSON или CSV форматы
 
 Ключевые классы:
+- Employee: запись о сотруднике, полученная из строки CSV
 - BaseReport: абстрактный базовый класс для отчётов
 - PayoutReport: реализация расчёта выплат
 - AverageRateReport: реализация расчёта средней ставки
@@ -20,30 +21,194 @@
   - Дополнительные поля: id, name, department
 """
 
-import argparse
+import csv
 import json
+import os
 import sys
 import logging
+import tempfile
+from collections import defaultdict
+from collections.abc import Callable, Container, Iterable, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass
+from itertools import chain, islice, repeat
+from operator import itemgetter, mul
 from pathlib import Path
+from types import SimpleNamespace
+from typing import IO, TYPE_CHECKING, TypeVar
 
-from src.constants import REPORT_NAMES, VALID_RATE_FIELDS
+from src.constants import MAX_PRESIZED_RECORDS, REPORT_NAMES, STREAM_CHUNK_SIZE, VALID_RATE_FIELDS
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson не установлен, используем stdlib json
+    orjson = None
 
+if TYPE_CHECKING:
+    import argparse
 
-def parse_csv(file_path: str) -> list[dict[str, str]]:
+T = TypeVar("T")
+
+@dataclass(slots=True)
+class Employee:
+    """
+    Запись о сотруднике с фиксированным набором полей.
+
+    Значения хранятся строками как в исходном файле; поле ставки
+    (hourly_rate, rate или salary) приводится к единому атрибуту rate.
+    rate равен None, если в исходных данных нет ни одного поля ставки.
+    """
+
+    id: str = ""
+    name: str = ""
+    department: str = ""
+    hours_worked: str = "0"
+    rate: str | None = None
+
+    @classmethod
+    def from_dict(cls, record: dict[str, str]) -> "Employee":
+        """
+        Создаёт запись из словаря с именами колонок CSV.
+
+        Параметры:
+            record (dict[str, str]): Запись сотрудника в виде словаря
+
+        Возвращает:
+            Employee: Запись сотрудника
+        """
+
+        rate_field = find_rate_field(record)
+        return cls(
+            id=record.get("id", ""),
+            name=record.get("name", ""),
+            department=record.get("department", ""),
+            hours_worked=record.get("hours_worked", "0"),
+            rate=record[rate_field] if rate_field else None,
+        )
+
+    def as_dict(self) -> dict[str, str | None]:
+        """Возвращает запись в виде словаря (ставка — под ключом rate)."""
+
+        return asdict(self)
+
+
+def build_row_factory(header: list[str]) -> Callable[[list[str]], Employee]:
+    """
+    Генерирует функцию, создающую Employee из значений строки CSV.
+
+    Все строки файла имеют один заголовок, поэтому позиции колонок
+    подставляются в код функции как константы, и разбор строки сводится
+    к индексации списка без поиска по именам колонок. Пробелы обрезаются
+    только у используемых колонок. В генерируемый код
+    попадают только имена полей Employee и целые индексы, но не текст
+    заголовка.
+
+    Параметры:
+        header (list[str]): Имена колонок файла
+
+    Возвращает:
+        Callable[[list[str]], Employee]: Функция make_row(values)
+    """
+
+    columns = {h: i for i, h in enumerate(header)}
+    arguments = ", ".join(
+        f"{field}=v[{columns[column]}].strip()"
+        for field, column in (
+            ("id", "id"),
+            ("name", "name"),
+            ("department", "department"),
+            ("hours_worked", "hours_worked"),
+            ("rate", find_rate_field(columns)),
+        )
+        if column in columns
+    )
+    namespace = {"Employee": Employee}
+    exec(f"def make_row(v):\n    return Employee({arguments})\n", namespace)
+    return namespace["make_row"]
+
+
+def find_record_start(open_from: Callable[[int], Iterable[str]], position: int) -> int:
+    """
+    Находит первую строку записи, на которой csv.reader завершается ошибкой.
+
+    Разбор с position повторяется с отслеживанием номеров строк; ошибка
+    воспроизводится на той же записи, поэтому её начало — строка сразу
+    после последней успешно прочитанной записи.
+
+    Параметры:
+        open_from (Callable[[int], Iterable[str]]): Строки файла начиная с n-й
+        position (int): Номер строки, с которой начинался разбор
+
+    Возвращает:
+        int: Номер первой строки ошибочной записи
+    """
+
+    reader = csv.reader(open_from(position), skipinitialspace=True)
+    last = 0
+    try:
+        for _ in reader:
+            last = reader.line_num
+    except csv.Error:
+        pass
+    return position + last
+
+
+def iter_csv_rows(open_from: Callable[[int], Iterable[str]], width: int, position: int = 0) -> Iterator[list[str]]:
+    """
+    Разбирает строки CSV и возвращает только записи с нужным числом полей.
+
+    Незакрытая кавычка заставляет csv.reader склеивать следующие строки
+    в одно значение. Если такая запись оказалась некорректной (или
+    csv.reader упал с ошибкой), пропускается только её первая строка,
+    а разбор возобновляется со следующей. Обычные строки читаются одним
+    csv.reader без дополнительного учёта строк.
+
+    Параметры:
+        open_from (Callable[[int], Iterable[str]]): Возвращает строки файла
+            (с сохранёнными переводами строк) начиная с n-й, считая с нуля
+        width (int): Ожидаемое количество полей
+        position (int): Номер строки, с которой начинается разбор
+
+    Возвращает:
+        Iterator[list[str]]: Значения полей корректных записей
+
+    Логирует:
+        Предупреждения о строках с несоответствующим количеством полей
+    """
+
+    while True:
+        reader = csv.reader(open_from(position), skipinitialspace=True)
+        try:
+            for values in reader:
+                if len(values) == width:
+                    yield values
+                    continue
+                # Переводы строк внутри значений показывают, сколько лишних
+                # физических строк поглотила запись
+                breaks = sum(v.count("\n") + v.count("\r") - v.count("\r\n") for v in values)
+                if not breaks:
+                    logging.warning("Пропущена строка с несоответствием количества полей: %s", ",".join(values))
+                    continue
+                start = position + reader.line_num - 1 - breaks
+                break
+            else:
+                return
+        except csv.Error:
+            start = find_record_start(open_from, position)
+        first_line = next(iter(open_from(start)), "")
+        logging.warning("Пропущена строка с несоответствием количества полей: %s", first_line.strip())
+        position = start + 1
+
+
+def parse_csv(file_path: str) -> list[Employee]:
     """
-    Парсит CSV-файл и преобразует его в список словарей.
+    Парсит CSV-файл и преобразует его в список записей Employee.
 
     Параметры:
         file_path (str): Путь к CSV-файлу
 
     Возвращает:
-        list[dict[str, str]]: Список записей в виде словарей
+        list[Employee]: Список записей сотрудников
 
     Исключения:
         FileNotFoundError: Если файл не существует
@@ -54,36 +219,144 @@ def parse_csv(file_path: str) -> list[dict[str, str]]:
         Ошибки при проблемах с чтением файла
     """
 
-    logging.info(f"Чтение файла: {file_path}")
+    logging.info("Чтение файла: %s", file_path)
     records = []
     try:
-        with open(file_path, encoding="utf-8") as f:
-            header = [h.strip() for h in f.readline().strip().split(",")]
-            for line in f:
-                values = [v.strip() for v in line.strip().split(",")]
-                if len(values) != len(header):
-                    logging.warning(f"Пропущена строка с несоответствием количества полей: {line.strip()}")
-                    continue
-                record = dict(zip(header, values))
-                records.append(record)
+        with open(file_path, encoding="utf-8", newline="") as f:
+            # Число строк оценивается по размеру файла и средней длине первых строк
+            # (обе величины в байтах), чтобы выделить список записей сразу; лишние
+            # элементы обрезаются в конце. Для неперематываемого ввода оценки нет
+            estimate = 0
+            if f.seekable():
+                sample = f.buffer.read(4096)
+                f.seek(0)
+                if sample:
+                    estimate = int(os.fstat(f.fileno()).st_size * max(sample.count(b"\n"), 1) / len(sample))
+                    estimate = min(estimate, MAX_PRESIZED_RECORDS)
+
+                def open_from(n: int) -> Iterator[str]:
+                    f.seek(0)
+                    return islice(f, n, None)
+            else:
+                # Неперематываемый ввод (например, канал) читается в память целиком,
+                # чтобы его можно было перечитать после ошибки разбора
+                lines = f.readlines()
+                estimate = len(lines)
+
+                def open_from(n: int) -> Iterator[str]:
+                    return islice(lines, n, None)
+
+            reader = csv.reader(open_from(0), skipinitialspace=True)
+            header = [h.strip() for h in next(reader, [])]
+            make_row = build_row_factory(header)
+            records = [None] * estimate
+            count = 0
+            for values in iter_csv_rows(open_from, len(header), reader.line_num):
+                if count < estimate:
+                    records[count] = make_row(values)
+                else:
+                    records.append(make_row(values))
+                count += 1
+            del records[count:]
     except FileNotFoundError:
-        logging.error(f"Файл не найден: {file_path}")
+        logging.error("Файл не найден: %s", file_path)
         sys.exit(1)
     except Exception as e:
-        logging.error(f"Ошибка чтения файла {file_path}: {e}")
+        logging.error("Ошибка чтения файла %s: %s", file_path, e)
         sys.exit(1)
     return records
 
 
+def calculate_payouts(hours: list[float], rates: list[float]) -> Iterator[float]:
+    """
+    Вычисляет выплаты по колонкам часов и ставок, округляя до копеек.
+
+    Колонки обрабатываются встроенными map/mul/round целиком,
+    без интерпретируемого цикла по элементам.
+
+    Параметры:
+        hours (list[float]): Отработанные часы
+        rates (list[float]): Ставки, по одной на каждый элемент hours
+
+    Возвращает:
+        Iterator[float]: Выплаты в том же порядке
+    """
+
+    return map(round, map(mul, hours, rates), repeat(2))
+
+
+def find_rate_field(record: Container[str]) -> str | None:
+    """
+    Определяет, какое из допустимых полей ставки присутствует в записи.
+
+    Параметры:
+        record (Container[str]): Запись сотрудника или набор колонок заголовка
+
+    Возвращает:
+        str | None: Имя поля ставки или None, если ни одно поле не найдено
+    """
+
+    return next((f for f in VALID_RATE_FIELDS if f in record), None)
+
+
+def map_files(func: Callable[[str], T], files: list[str]) -> list[T]:
+    """
+    Применяет функцию к каждому из входных файлов.
+
+    Файлы независимы друг от друга, поэтому при нескольких файлах и
+    нескольких процессорах они обрабатываются параллельно в отдельных
+    процессах; порядок результатов совпадает с порядком файлов. Результаты
+    передаются между процессами через pickle, поэтому func должна
+    возвращать компактные данные (например, частичные суммы), а не записи.
+
+    Параметры:
+        func (Callable[[str], T]): Функция, принимающая путь к файлу
+        files (list[str]): Пути к CSV-файлам
+
+    Возвращает:
+        list[T]: Результаты func для каждого файла
+    """
+
+    max_workers = min(len(files), os.cpu_count() or 1)
+    if max_workers == 1:
+        return [func(file) for file in files]
+
+    # concurrent.futures тянет за собой multiprocessing, поэтому импортируется
+    # только когда пул действительно нужен
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, files))
+
+
+def load_records(files: list[str]) -> Iterator[Employee]:
+    """
+    Читает записи из нескольких CSV-файлов.
+
+    Файлы читаются последовательно и лениво: записи не копируются в общий
+    список, и при построчной обработке в памяти находятся записи только
+    текущего файла. Параллельный разбор здесь не используется — передача
+    записей из дочерних процессов обходится дороже самого разбора.
+
+    Параметры:
+        files (list[str]): Пути к CSV-файлам
+
+    Возвращает:
+        Iterator[Employee]: Записи всех файлов в порядке файлов
+    """
+
+    return chain.from_iterable(map(parse_csv, files))
+
+
 class BaseReport:
     """Абстрактный базовый класс для генерации отчётов."""
 
-    def generate(self, records: list[dict[str, str]]) -> dict:
+    def generate(self, records: list[Employee | dict[str, str]]) -> dict:
         """
         Абстрактный метод для генерации отчёта.
 
         Параметры:
-            records (list[dict[str, str]]): Список записей сотрудников
+            records (list[Employee | dict[str, str]]): Список записей сотрудников
 
         Исключения:
             NotImplementedError: При прямом вызове метода базового класса
@@ -91,16 +364,95 @@ class BaseReport:
 
         raise NotImplementedError("Метод generate должен быть реализован в дочерних классах")
 
+    def generate_from_files(self, files: list[str], stream: bool = False) -> dict:
+        """
+        Читает CSV-файлы и генерирует по ним отчёт.
+
+        Файлы читаются последовательно через load_records. При stream=True
+        в памяти одновременно находятся записи только текущего файла; без
+        него generate получает записи всех файлов и строит полный отчёт.
+
+        Параметры:
+            files (list[str]): Пути к CSV-файлам
+            stream (bool): Вернуть результаты в виде итератора (см. stream)
+
+        Возвращает:
+            dict: Отчёт в формате generate (или stream при stream=True)
+        """
+
+        records = load_records(files)
+        return self.stream(records) if stream else self.generate(records)
+
+    def stream(self, records: Iterable[Employee | dict[str, str]]) -> dict:
+        """
+        Генерирует отчёт для построчной записи в файл.
+
+        По умолчанию совпадает с generate; отчёты, результаты которых можно
+        получать по одной записи, переопределяют метод и возвращают итератор,
+        чтобы не держать весь список результатов в памяти.
+
+        Параметры:
+            records (Iterable[Employee | dict[str, str]]): Записи сотрудников
+
+        Возвращает:
+            dict: Отчёт в формате generate
+        """
+
+        return self.generate(records)
+
 
 class PayoutReport(BaseReport):
     """Класс для генерации отчёта по выплатам сотрудников."""
 
-    def generate(self, records: list[dict[str, str]]) -> dict:
+    def iter_results(self, records: Iterable[Employee | dict[str, str]]) -> Iterator[dict]:
+        """
+        Лениво рассчитывает выплаты, обрабатывая записи порциями.
+
+        Параметры:
+            records (Iterable[Employee | dict[str, str]]): Записи сотрудников
+
+        Возвращает:
+            Iterator[dict]: Записи вида {"id", "name", "department", "payout"}
+
+        Логирует:
+            Предупреждения о записях с отсутствующими полями ставок
+            Ошибки обработки записей
+        """
+
+        logging.info("Формируется отчёт payout")
+        records = iter(records)
+        warn = logging.getLogger().isEnabledFor(logging.WARNING)
+        while chunk := list(islice(records, STREAM_CHUNK_SIZE)):
+            ids, names, departments, hours, rates = [], [], [], [], []
+            for r in chunk:
+                if not isinstance(r, Employee):
+                    r = Employee.from_dict(r)
+                if r.rate is None:
+                    if warn:
+                        logging.warning("Пропущена запись (отсутствует поле ставки): %s", r)
+                    continue
+                try:
+                    hours_value = float(r.hours_worked)
+                    rate_value = float(r.rate)
+                except (TypeError, ValueError) as e:
+                    if warn:
+                        logging.warning("Ошибка обработки записи: %s — %s", r, e)
+                    continue
+                ids.append(r.id)
+                names.append(r.name)
+                departments.append(r.department)
+                hours.append(hours_value)
+                rates.append(rate_value)
+
+            for i, n, d, p in zip(ids, names, departments, calculate_payouts(hours, rates)):
+                yield {"id": i, "name": n, "department": d, "payout": p}
+
+    def generate(self, records: list[Employee | dict[str, str]]) -> dict:
         """
         Рассчитывает выплаты для каждого сотрудника.
 
         Параметры:
-            records (list[dict[str, str]]): Список записей сотрудников
+            records (list[Employee | dict[str, str]]): Список записей сотрудников
 
         Возвращает:
             dict: Результаты в формате:
@@ -121,37 +473,31 @@ class PayoutReport(BaseReport):
             Ошибки обработки записей
         """
 
-        logging.info("Формируется отчёт payout")
-        result = []
-        for r in records:
-            try:
-                hours = float(r.get("hours_worked", 0))
-                rate_field = next((f for f in VALID_RATE_FIELDS if f in r), None)
-                if not rate_field:
-                    logging.warning(f"Пропущена запись (отсутствует поле ставки): {r}")
-                    continue
-                rate = float(r[rate_field])
-                payout = hours * rate
-                result.append({
-                    "id": r.get("id", ""),
-                    "name": r.get("name", ""),
-                    "department": r.get("department", ""),
-                    "payout": round(payout, 2)
-                })
-            except Exception as e:
-                logging.warning(f"Ошибка обработки записи: {r} — {e}")
-        return {"report": "payout", "results": result}
+        return {"report": "payout", "results": list(self.iter_results(records))}
+
+    def stream(self, records: Iterable[Employee | dict[str, str]]) -> dict:
+        """
+        Возвращает отчёт, в котором "results" — ленивый итератор выплат.
+
+        Параметры:
+            records (Iterable[Employee | dict[str, str]]): Записи сотрудников
+
+        Возвращает:
+            dict: {"report": "payout", "results": итератор записей выплат}
+        """
+
+        return {"report": "payout", "results": self.iter_results(records)}
 
 
 class AverageRateReport(BaseReport):
     """Класс для генерации отчёта по средней ставке по отделам."""
 
-    def generate(self, records: list[dict[str, str]]) -> dict:
+    def generate(self, records: list[Employee | dict[str, str]]) -> dict:
         """
         Рассчитывает среднюю ставку для каждого отдела.
 
         Параметры:
-            records (list[dict[str, str]]): Список записей сотрудников
+            records (list[Employee | dict[str, str]]): Список записей сотрудников
 
         Возвращает:
             dict: Результаты в формате:
@@ -169,22 +515,145 @@ class AverageRateReport(BaseReport):
         """
 
         logging.info("Формируется отчёт average_rate")
-        departments = {}
+        return self.summarize([self.accumulate(records)])
+
+    def generate_from_files(self, files: list[str], stream: bool = False) -> dict:
+        """
+        Читает CSV-файлы и рассчитывает среднюю ставку по отделам.
+
+        Суммы и количества ставок считаются отдельно по каждому файлу
+        (параллельно при нескольких файлах и процессорах) и затем
+        объединяются. Записи разных файлов не собираются вместе и не
+        передаются между процессами — в памяти остаются только частичные
+        суммы по отделам. Параметр stream не влияет на результат: итоговый
+        словарь невелик.
+
+        Параметры:
+            files (list[str]): Пути к CSV-файлам
+            stream (bool): Не используется
+
+        Возвращает:
+            dict: Отчёт в формате generate
+        """
+
+        logging.info("Формируется отчёт average_rate")
+        return self.summarize(map_files(self.accumulate_file, files))
+
+    def accumulate_file(self, file_path: str) -> dict[str, tuple[float, int]]:
+        """Считает суммы и количества ставок по отделам для одного CSV-файла."""
+
+        return self.accumulate(parse_csv(file_path))
+
+    def accumulate(self, records: Iterable[Employee | dict[str, str]]) -> dict[str, tuple[float, int]]:
+        """
+        Считает сумму и количество ставок для каждого отдела.
+
+        Параметры:
+            records (Iterable[Employee | dict[str, str]]): Записи сотрудников
+
+        Возвращает:
+            dict[str, tuple[float, int]]: {отдел: (сумма_ставок, количество)}
+
+        Логирует:
+            Предупреждения о записях с отсутствующими полями ставок
+            Ошибки обработки записей
+        """
+
+        sums = defaultdict(float)
+        counts = defaultdict(int)
+        warn = logging.getLogger().isEnabledFor(logging.WARNING)
         for r in records:
+            if not isinstance(r, Employee):
+                r = Employee.from_dict(r)
+            if r.rate is None:
+                if warn:
+                    logging.warning("Пропущена запись (отсутствует поле ставки): %s", r)
+                continue
             try:
-                rate_field = next((f for f in VALID_RATE_FIELDS if f in r), None)
-                if not rate_field:
-                    logging.warning(f"Пропущена запись (отсутствует поле ставки): {r}")
-                    continue
-                dept = r.get("department", "")
-                rate = float(r[rate_field])
-                departments.setdefault(dept, []).append(rate)
-            except Exception as e:
-                logging.warning(f"Ошибка обработки записи: {r} — {e}")
-        averages = {dept: round(sum(rates) / len(rates), 2) for dept, rates in departments.items() if rates}
+                rate = float(r.rate)
+            except (TypeError, ValueError) as e:
+                if warn:
+                    logging.warning("Ошибка обработки записи: %s — %s", r, e)
+                continue
+            dept = r.department
+            sums[dept] += rate
+            counts[dept] += 1
+        return {dept: (sums[dept], counts[dept]) for dept in sums}
+
+    def summarize(self, partials: Iterable[dict[str, tuple[float, int]]]) -> dict:
+        """
+        Объединяет частичные суммы и рассчитывает средние ставки.
+
+        Параметры:
+            partials (Iterable[dict[str, tuple[float, int]]]): Результаты accumulate
+
+        Возвращает:
+            dict: Отчёт в формате generate
+        """
+
+        sums = defaultdict(float)
+        counts = defaultdict(int)
+        for partial in partials:
+            for dept, (total, count) in partial.items():
+                sums[dept] += total
+                counts[dept] += count
+        averages = {dept: round(sums[dept] / counts[dept], 2) for dept in sums}
         return {"report": "average_rate", "results": averages}
 
 
+def dump_json(data: dict) -> bytes:
+    """
+    Сериализует данные отчёта в JSON (UTF-8, отступ 2 пробела).
+
+    Использует orjson, если он установлен, иначе стандартный модуль json.
+
+    Параметры:
+        data (dict): Данные отчёта
+
+    Возвращает:
+        bytes: JSON-представление в кодировке UTF-8
+    """
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+@contextmanager
+def open_atomic(output_path: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """
+    Открывает временный файл, который заменяет output_path только при успехе.
+
+    Файл пишется рядом с output_path и переносится на его место через
+    os.replace после закрытия. При любой ошибке (в том числе sys.exit при
+    чтении входных файлов во время потоковой записи) временный файл
+    удаляется, а прежний отчёт остаётся нетронутым.
+
+    Параметры:
+        output_path (str): Путь к итоговому файлу
+        mode (str): Режим открытия ("w" или "wb")
+        **kwargs: Дополнительные аргументы open (encoding, newline)
+
+    Возвращает:
+        Iterator[IO]: Файловый объект временного файла
+    """
+
+    path = Path(output_path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp создаёт файл с правами 0600; выставляем обычные права с учётом umask
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
 def write_output(data: dict, output_path: str | None):
     """
     Записывает результаты отчёта в файл или выводит в stdout.
@@ -206,30 +675,95 @@ def write_output(data: dict, output_path: str | None):
         ext = Path(output_path).suffix.lower()
         try:
             if ext == ".json":
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
+                with open_atomic(output_path, "wb") as f:
+                    f.write(dump_json(data))
             elif ext == ".csv":
-                with open(output_path, "w", encoding="utf-8") as f:
+                with open_atomic(output_path, "w", encoding="utf-8", newline="") as f:
+                    writer = csv.writer(f, lineterminator="\n")
                     if data["report"] == "payout":
-                        f.write("id,name,department,payout\n")
-                        for r in data["results"]:
-                            f.write(f'{r["id"]},{r["name"]},{r["department"]},{r["payout"]}\n')
+                        fields = ("id", "name", "department", "payout")
+                        writer.writerow(fields)
+                        writer.writerows(map(itemgetter(*fields), data["results"]))
                     elif data["report"] == "average_rate":
-                        f.write("department,average_rate\n")
-                        for dept, avg in data["results"].items():
-                            f.write(f"{dept},{avg}\n")
+                        writer.writerow(("department", "average_rate"))
+                        writer.writerows(data["results"].items())
                     else:
                         logging.error("Неподдерживаемый формат отчета для CSV")
                         sys.exit(1)
             else:
                 logging.error("Неподдерживаемый формат файла вывода")
                 sys.exit(1)
-            logging.info(f"Отчёт успешно сохранён в {output_path}")
+            logging.info("Отчёт успешно сохранён в %s", output_path)
         except Exception as e:
-            logging.error(f"Ошибка записи в файл {output_path}: {e}")
+            logging.error("Ошибка записи в файл %s: %s", output_path, e)
             sys.exit(1)
     else:
-        print(json.dumps(data, indent=4, ensure_ascii=False))
+        payload = dump_json(data) + b"\n"
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is not None:
+            sys.stdout.flush()
+            buffer.write(payload)
+            buffer.flush()
+        else:
+            sys.stdout.write(payload.decode("utf-8"))
+
+
+def build_parser() -> "argparse.ArgumentParser":
+    """
+    Создаёт парсер аргументов командной строки на основе argparse.
+
+    argparse импортируется только здесь: он нужен для справки (--help)
+    и сообщений об ошибках, но не для разбора обычного запуска.
+
+    Возвращает:
+        argparse.ArgumentParser: Парсер аргументов
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Генерация отчётов по зарплатам сотрудников")
+    parser.add_argument("files", nargs="+", help="Один или несколько CSV-файлов")
+    parser.add_argument("--report", required=True, choices=REPORT_NAMES, help="Тип отчёта: payout или average_rate")
+    parser.add_argument("--output", help="Путь к выходному файлу (json или csv)")
+    return parser
+
+
+def parse_args(argv: list[str]) -> SimpleNamespace:
+    """
+    Разбирает аргументы командной строки.
+
+    Обычный запуск (файлы, --report и необязательный --output) разбирается
+    простым проходом по argv. Всё остальное — --help, неизвестные или
+    сокращённые опции, формат --opt=value, ошибки в аргументах — передаётся
+    в argparse, который выводит справку или сообщение об ошибке.
+
+    Параметры:
+        argv (list[str]): Аргументы без имени программы
+
+    Возвращает:
+        SimpleNamespace: Атрибуты files, report и output
+    """
+
+    files = []
+    options = {"--report": None, "--output": None}
+    # Как и в argparse, файлы должны идти одной группой подряд
+    files_closed = False
+    arguments = iter(argv)
+    for arg in arguments:
+        if arg in options:
+            value = next(arguments, None)
+            if value is None or value.startswith("-"):
+                break
+            options[arg] = value
+            files_closed = bool(files)
+        elif arg.startswith("-") or files_closed:
+            break
+        else:
+            files.append(arg)
+    else:
+        if files and options["--report"] in REPORT_NAMES:
+            return SimpleNamespace(files=files, report=options["--report"], output=options["--output"])
+    return build_parser().parse_args(argv)
 
 
 def main():
@@ -246,18 +780,18 @@ def main():
         Ошибки при неверных параметрах
     """
 
-    parser = argparse.ArgumentParser(description="Генерация отчётов по зарплатам сотрудников")
-    parser.add_argument("files", nargs="+", help="Один или несколько CSV-файлов")
-    parser.add_argument("--report", required=True, choices=REPORT_NAMES, help="Тип отчёта: payout или average_rate")
-    parser.add_argument("--output", help="Путь к выходному файлу (json или csv)")
-    args = parser.parse_args()
+    args = parse_args(sys.argv[1:])
 
-    logging.info(f"Тип отчёта: {args.report}")
-    logging.info(f"Файлы на вход: {args.files}")
+    # Логирование настраивается только при запуске CLI, а не при импорте модуля
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
-    all_records = []
-    for file in args.files:
-        all_records.extend(parse_csv(file))
+    logging.info("Тип отчёта: %s", args.report)
+    logging.info("Файлы на вход: %s", args.files)
 
     match args.report:
         case "payout":
@@ -267,7 +801,9 @@ def main():
         case _:
             report_class = BaseReport()
 
-    report = report_class.generate(all_records)
+    # CSV пишется построчно, поэтому выплаты можно не накапливать в памяти
+    stream = bool(args.output) and Path(args.output).suffix.lower() == ".csv"
+    report = report_class.generate_from_files(args.files, stream=stream)
     write_output(report, args.output)
 
 
@@ -3,12 +3,13 @@ import os
 import subprocess
 import json
 import sys
+import threading
 from pathlib import Path
 from io import StringIO
 
 import pytest
 
-from src.main import main, parse_csv, PayoutReport, write_output, AverageRateReport
+from src.main import main, parse_csv, PayoutReport, write_output, AverageRateReport, dump_json, load_records, Employee, build_row_factory, parse_args, map_files
 
 
 def test_script_runs(tmp_path):
@@ -124,3 +125,179 @@ def test_payout_report_data_processing_error(caplog):
 
     assert len(report["results"]) == 0  # Покрывает строку 94
     assert "Ошибка обработки записи" in caplog.text
+
+def test_json_output_unicode(tmp_path):
+    """Тестирует сохранение JSON-отчёта с кириллицей без экранирования."""
+    out_file = tmp_path / "report.json"
+    data = {"report": "average_rate", "results": {"Бухгалтерия": 45.0}}
+    write_output(data, str(out_file))
+
+    assert out_file.read_bytes() == dump_json(data)
+    assert json.loads(out_file.read_text(encoding="utf-8")) == data
+    assert '"Бухгалтерия": 45.0' in out_file.read_text(encoding="utf-8")
+
+def test_parse_csv_quoted_fields(tmp_path):
+    """Тестирует разбор значений в кавычках, содержащих запятые."""
+    csv_file = tmp_path / "quoted.csv"
+    csv_file.write_text('id,name,department,hours_worked,rate\n1,"Doe, John",IT,10,20\n')
+    records = parse_csv(str(csv_file))
+
+    assert records == [Employee(id="1", name="Doe, John", department="IT", hours_worked="10", rate="20")]
+
+def test_parse_csv_crlf_line_endings(tmp_path, caplog):
+    """Тестирует разбор файла с переводами строк Windows и пустой строкой в конце."""
+    csv_file = tmp_path / "crlf.csv"
+    csv_file.write_bytes(b"id,name,department,hours_worked,rate\r\n1,A,IT,10,20\r\n2,B,HR,5,30\r\n")
+    records = parse_csv(str(csv_file))
+
+    assert [r.rate for r in records] == ["20", "30"]
+    assert "несоответствием количества полей" not in caplog.text
+
+def test_multiple_files_payout(monkeypatch, tmp_path):
+    """Тестирует payout-отчёт по нескольким файлам с разными полями ставки."""
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    out_file = tmp_path / "report.json"
+    first.write_text("id,name,department,hours_worked,hourly_rate\n1,A,IT,10,20\n")
+    second.write_text("id,name,department,hours_worked,salary\n2,B,HR,5,30\n")
+    monkeypatch.setattr(sys, "argv", ["main.py", str(first), str(second), "--report", "payout", "--output", str(out_file)])
+    main()
+
+    results = json.loads(out_file.read_text(encoding="utf-8"))["results"]
+    assert [(r["id"], r["payout"]) for r in results] == [("1", 200.0), ("2", 150.0)]
+
+def test_multiple_files_missing_file(tmp_path):
+    """Тестирует завершение с кодом 1, если один из нескольких файлов не найден."""
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("id,name,department,hours_worked,rate\n1,A,IT,10,20\n")
+    with pytest.raises(SystemExit) as exc_info:
+        list(load_records([str(csv_file), str(tmp_path / "missing.csv")]))
+    assert exc_info.value.code == 1
+
+def test_csv_output_quotes_commas(tmp_path):
+    """Тестирует экранирование запятых в значениях при сохранении CSV."""
+    out_file = tmp_path / "report.csv"
+    data = {"report": "payout", "results": [{"id": "1", "name": "Doe, John", "department": "IT", "payout": 200.0}]}
+    write_output(data, str(out_file))
+
+    assert out_file.read_text(encoding="utf-8") == 'id,name,department,payout\n1,"Doe, John",IT,200.0\n'
+
+def test_build_row_factory():
+    """Тестирует генерацию конструктора записи по заголовку с произвольным порядком колонок."""
+    make_row = build_row_factory(["salary", "email", "department", "id"])
+
+    assert make_row(["30", "a@example.com", "IT", "7"]) == Employee(id="7", department="IT", rate="30")
+
+def test_parse_csv_spaces_around_fields(tmp_path):
+    """Тестирует обрезку пробелов вокруг значений, в том числе перед кавычками."""
+    csv_file = tmp_path / "spaces.csv"
+    csv_file.write_text('id, name, department, hours_worked, rate\n 1 , "Doe, John", IT ,10, 20 \n')
+    records = parse_csv(str(csv_file))
+
+    assert records == [Employee(id="1", name="Doe, John", department="IT", hours_worked="10", rate="20")]
+
+def test_multiple_files_average_rate(monkeypatch, tmp_path):
+    """Тестирует average_rate-отчёт по нескольким файлам с объединением частичных сумм."""
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    out_file = tmp_path / "report.json"
+    first.write_text("id,name,department,hours_worked,hourly_rate\n1,A,IT,10,20\n2,B,HR,10,50\n")
+    second.write_text("id,name,department,hours_worked,salary\n3,C,IT,5,40\n")
+    monkeypatch.setattr(sys, "argv", ["main.py", str(first), str(second), "--report", "average_rate", "--output", str(out_file)])
+    main()
+
+    assert json.loads(out_file.read_text(encoding="utf-8"))["results"] == {"IT": 30.0, "HR": 50.0}
+
+def test_parse_args_fast_path():
+    """Тестирует разбор обычного набора аргументов без argparse."""
+    args = parse_args(["a.csv", "b.csv", "--report", "payout", "--output", "out.csv"])
+    assert (args.files, args.report, args.output) == (["a.csv", "b.csv"], "payout", "out.csv")
+
+    args = parse_args(["--report", "average_rate", "a.csv"])
+    assert (args.files, args.report, args.output) == (["a.csv"], "average_rate", None)
+
+@pytest.mark.parametrize("argv, code", [
+    (["--help"], 0),
+    (["a.csv"], 2),
+    (["a.csv", "--report", "unknown"], 2),
+    (["a.csv", "--report", "payout", "b.csv"], 2),
+    (["a.csv", "--report"], 2),
+])
+def test_parse_args_fallback_to_argparse(argv, code, capsys):
+    """Тестирует передачу справки и ошибочных аргументов в argparse."""
+    with pytest.raises(SystemExit) as exc_info:
+        parse_args(argv)
+    assert exc_info.value.code == code
+    captured = capsys.readouterr()
+    assert "usage:" in captured.out + captured.err
+
+def test_parse_args_equals_form():
+    """Тестирует формат --opt=value, обрабатываемый через argparse."""
+    args = parse_args(["a.csv", "--report=payout"])
+    assert (args.files, args.report, args.output) == (["a.csv"], "payout", None)
+
+def test_map_files_serial_on_single_cpu(monkeypatch):
+    """Тестирует последовательную обработку файлов без пула процессов на одном CPU."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    # lambda не сериализуется pickle, поэтому пул процессов здесь завершился бы ошибкой
+    assert map_files(lambda file: file.upper(), ["a.csv", "b.csv"]) == ["A.CSV", "B.CSV"]
+
+def test_parse_csv_multiline_quoted_field(tmp_path):
+    """Тестирует значение в кавычках с переводом строки и сохранность следующих строк."""
+    csv_file = tmp_path / "multiline.csv"
+    csv_file.write_text('id,name,department,hours_worked,rate\n1,"A\nB",IT,10,20\n2,B,HR,5,30\n3,C,IT,5,30\n')
+    records = parse_csv(str(csv_file))
+
+    assert [(r.id, r.name, r.rate) for r in records] == [("1", "A\nB", "20"), ("2", "B", "30"), ("3", "C", "30")]
+
+def test_parse_csv_stray_quote(tmp_path, caplog):
+    """Тестирует пропуск только строки с незакрытой кавычкой."""
+    csv_file = tmp_path / "stray.csv"
+    csv_file.write_text('id,name,department,hours_worked,rate\n1,A,IT,10,20\n99,"Bad,D1,160,50\n2,B,HR,5,30\n3,C,IT,5,30\n')
+    records = parse_csv(str(csv_file))
+
+    assert [(r.id, r.rate) for r in records] == [("1", "20"), ("2", "30"), ("3", "30")]
+    assert 'Пропущена строка с несоответствием количества полей: 99,"Bad,D1,160,50' in caplog.text
+    assert caplog.text.count("WARNING") == 1
+
+def test_parse_csv_stray_quote_large_file(tmp_path):
+    """Тестирует, что незакрытая кавычка не прерывает разбор большого файла."""
+    csv_file = tmp_path / "stray_large.csv"
+    rows = [f"{i},Name {i},D1,160,50\n" for i in range(10000)]
+    rows.insert(10, '99,"Bad,D1,160,50\n')
+    csv_file.write_text("id,name,department,hours_worked,rate\n" + "".join(rows))
+    records = parse_csv(str(csv_file))
+
+    assert len(records) == 10000
+
+def test_failed_run_keeps_existing_csv(monkeypatch, tmp_path):
+    """Тестирует, что при ошибке чтения второго файла прежний CSV-отчёт не затирается."""
+    csv_file = tmp_path / "data.csv"
+    out_file = tmp_path / "report.csv"
+    csv_file.write_text("id,name,department,hours_worked,rate\n1,A,IT,10,20\n")
+    out_file.write_text("id,name,department,payout\n7,Old,HR,100.0\n")
+    monkeypatch.setattr(sys, "argv", [
+        "main.py", str(csv_file), str(tmp_path / "missing.csv"), "--report", "payout", "--output", str(out_file)
+    ])
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == 1
+    assert out_file.read_text() == "id,name,department,payout\n7,Old,HR,100.0\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.csv", "report.csv"]
+
+def test_parse_csv_from_pipe(tmp_path):
+    """Тестирует разбор неперематываемого ввода (именованного канала)."""
+    fifo = tmp_path / "data.fifo"
+    os.mkfifo(fifo)
+
+    def feed():
+        with open(fifo, "w", encoding="utf-8") as f:
+            f.write("id,name,department,hours_worked,rate\n1,Иван,IT,10,20\n")
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    records = parse_csv(str(fifo))
+    writer.join()
+
+    assert records == [Employee(id="1", name="Иван", department="IT", hours_worked="10", rate="20")]
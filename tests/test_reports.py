@@ -1,5 +1,5 @@
 import pytest
-from src.main import PayoutReport, AverageRateReport
+from src.main import PayoutReport, AverageRateReport, Employee, calculate_payouts
 
 @pytest.fixture
 def sample_records():
@@ -32,3 +32,40 @@ def test_average_rate_report(sample_records):
 
     assert result["results"]["HR"] == 45.0
     assert result["results"]["Engineering"] == 57.5
+
+def test_reports_mixed_rate_fields():
+    records = [
+        {"id": "1", "name": "A", "department": "HR", "hours_worked": "10", "hourly_rate": "50"},
+        {"id": "2", "name": "B", "department": "HR", "hours_worked": "10", "hourly_rate": "30"},
+        {"id": "3", "name": "C", "department": "IT", "hours_worked": "10", "salary": "70"},
+        {"id": "4", "name": "D", "department": "IT", "hours_worked": "10", "rate": "90"},
+    ]
+
+    payouts = {r["name"]: r["payout"] for r in PayoutReport().generate(records)["results"]}
+    assert payouts == {"A": 500.0, "B": 300.0, "C": 700.0, "D": 900.0}
+
+    averages = AverageRateReport().generate(records)["results"]
+    assert averages == {"HR": 40.0, "IT": 80.0}
+
+def test_payout_stream_matches_generate(sample_records):
+    report = PayoutReport()
+    streamed = report.stream(sample_records)
+
+    assert streamed["report"] == "payout"
+    assert not isinstance(streamed["results"], list)
+    assert list(streamed["results"]) == report.generate(sample_records)["results"]
+
+def test_calculate_payouts():
+    assert list(calculate_payouts([160.0, 10.5, 0.0], [50.0, 33.333, 100.0])) == [8000.0, 350.0, 0.0]
+
+def test_employee_from_dict(sample_records):
+    alice = Employee.from_dict(sample_records[0])
+    assert alice == Employee(id="1", name="Alice", department="HR", hours_worked="160", rate="50")
+    assert alice.as_dict() == {"id": "1", "name": "Alice", "department": "HR", "hours_worked": "160", "rate": "50"}
+    assert Employee.from_dict(sample_records[3]).rate is None
+
+def test_reports_accept_employees(sample_records):
+    employees = [Employee.from_dict(r) for r in sample_records]
+
+    assert PayoutReport().generate(employees) == PayoutReport().generate(sample_records)
+    assert AverageRateReport().generate(employees) == AverageRateReport().generate(sample_records)